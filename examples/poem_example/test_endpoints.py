@@ -10,16 +10,35 @@ Usage:
 
     # With custom host/port:
     python3 test_endpoints.py --host localhost --port 3000
+
+    # Multiplex all requests over one HTTP/2 connection (needs httpx[http2]):
+    python3 test_endpoints.py --http2
 """
 
-import requests
+import asyncio
+import httpx
 import sys
 import argparse
+import collections
+import functools
+import importlib.util
 import json
-from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+import socket
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
 from enum import Enum
 
+try:
+    import orjson
+
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    json_loads = json.loads
+
 
 class Color:
     """ANSI color codes for terminal output."""
@@ -32,6 +51,52 @@ class Color:
     CYAN = '\033[96m'
 
 
+# Connection pool sizing for the shared client. Keep-alive capacity matches
+# the connection cap so bursts of concurrent tests never close sockets that
+# would otherwise be reused for the next request.
+POOL_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=64,
+    keepalive_expiry=30.0,
+)
+
+# Send small request bodies immediately (no Nagle delay) and keep idle pooled
+# connections alive between bursts of tests.
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# Localhost responses take milliseconds, so fail fast on a hung server
+# rather than waiting seconds per request. SUITE_TIMEOUT bounds the whole run.
+TIMEOUT = httpx.Timeout(2.0, connect=0.5)
+# Logins verify Argon2 password hashes in the handler, which is slow in a
+# debug build (`cargo run`), so they get a longer read budget.
+LOGIN_TIMEOUT = httpx.Timeout(10.0, connect=0.5)
+SUITE_TIMEOUT = 60.0
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+INVALID_LOGIN_BODY = json_dumps({"username": "alice", "password": "wrongpassword"})
+
+
+class ServerUnavailableError(Exception):
+    """Raised when the server cannot be reached at the start of a run."""
+
+
+def http2_available() -> bool:
+    """Whether the optional h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def error_message(error: httpx.HTTPError) -> str:
+    """Short, fixed description of a transport error."""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.ConnectError):
+        return "connection error"
+    return type(error).__name__
+
+
 class TestResult(Enum):
     """Test result status."""
     PASS = "PASS"
@@ -39,55 +104,124 @@ class TestResult(Enum):
     SKIP = "SKIP"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestUser:
     """Represents a test user with credentials and expected permissions."""
     username: str
     password: str
-    groups: list
+    groups: FrozenSet[str]
     description: str
+    # Login request body, serialized once instead of on every login
+    login_body: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "login_body", json_dumps({"username": self.username, "password": self.password}))
 
     def has_group(self, group: str) -> bool:
         """Check if user has a specific group."""
         return group in self.groups
 
 
+# Phases whose sections report EndpointTest rows
+ENDPOINT_PHASES = ("2", "2B")
+
+
+@dataclass(frozen=True)
+class EndpointTest:
+    """A protected endpoint with the status expected for a given user."""
+    phase: str
+    endpoint: str
+    requirement: str
+    feature: str
+    expected: Callable[[TestUser], int]
+    # When set, also request the endpoint without a token and expect this status
+    no_auth_status: Optional[int] = None
+
+    def __post_init__(self):
+        if self.phase not in ENDPOINT_PHASES:
+            raise ValueError(f"{self.endpoint}: unknown phase {self.phase!r}")
+
+
+# Protected endpoint matrix. Every user is probed against every row after
+# logging in, and each row is reported in its phase's section.
+TESTS: List[EndpointTest] = [
+    EndpointTest("2", "/protected", "requires any authenticated user",
+                 "Automatic UserClaims extraction via FromRequest",
+                 lambda u: 200, no_auth_status=401),
+    EndpointTest("2", "/admin", "requires 'admins' group",
+                 "Manual guard check inside handler",
+                 lambda u: 200 if "admins" in u.groups else 403),
+    EndpointTest("2", "/moderator", "requires 'admins' OR 'moderators' group",
+                 "Composable guards (HasAnyGroup)",
+                 lambda u: 200 if not u.groups.isdisjoint(("admins", "moderators")) else 403),
+    EndpointTest("2B", "/admin/macro", "macro: #[require_group(\"admins\")]",
+                 "Declarative single-group authorization",
+                 lambda u: 200 if "admins" in u.groups else 403),
+    EndpointTest("2B", "/moderator/macro", "macro: #[require_any_groups(\"admins\", \"moderators\")]",
+                 "Declarative OR-logic authorization",
+                 lambda u: 200 if not u.groups.isdisjoint(("admins", "moderators")) else 403),
+    EndpointTest("2B", "/dev/macro", "macro: #[require_all_groups(\"developers\", \"verified\")]",
+                 "Declarative AND-logic authorization",
+                 lambda u: 200 if u.groups.issuperset(("developers", "verified")) else 403),
+]
+
+
 class EndpointTester:
     """Tests all poem_auth example endpoints."""
 
-    def __init__(self, host: str = "localhost", port: int = 3000):
+    def __init__(self, host: str = "localhost", port: int = 3000, http2: bool = False):
+        if http2 and not http2_available():
+            raise ImportError("HTTP/2 requires the h2 package: pip install 'httpx[http2]'")
+
         self.base_url = f"http://{host}:{port}"
-        self.session = requests.Session()
-        self.test_results = []
+        # The example server speaks plain HTTP, so there is no TLS ALPN to
+        # negotiate HTTP/2. With http2 enabled we use prior knowledge (h2c)
+        # and every request becomes a stream on a single connection.
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(
+                http1=not http2,
+                http2=http2,
+                limits=POOL_LIMITS,
+                socket_options=SOCKET_OPTIONS,
+            ),
+        )
+        # Per-endpoint results of the probes started right after each login
+        self._user_results: Dict[str, List[Tuple[str, TestResult, str]]] = {}
+        self._counts = collections.Counter()
+        self._failed_names = []
         self.tokens = {}
+        # Authorization headers built once per user when their token arrives
+        self._auth_headers: Dict[str, Dict[str, str]] = {}
 
         # Define test users matching auth.toml
-        self.users = {
-            "alice": TestUser(
+        self.users: List[TestUser] = [
+            TestUser(
                 username="alice",
                 password="password123",
-                groups=["users", "admins"],
+                groups=frozenset({"users", "admins"}),
                 description="Admin user (all permissions)"
             ),
-            "bob": TestUser(
+            TestUser(
                 username="bob",
                 password="secret456",
-                groups=["users"],
+                groups=frozenset({"users"}),
                 description="Regular user (minimal permissions)"
             ),
-            "charlie": TestUser(
+            TestUser(
                 username="charlie",
                 password="mod123456",
-                groups=["users", "moderators"],
+                groups=frozenset({"users", "moderators"}),
                 description="Moderator (mod permissions)"
             ),
-            "dave": TestUser(
+            TestUser(
                 username="dave",
                 password="dev123456",
-                groups=["users", "developers", "verified"],
+                groups=frozenset({"users", "developers", "verified"}),
                 description="Developer (dev permissions)"
             ),
-        }
+        ]
 
     def print_header(self, text: str):
         """Print a colored header."""
@@ -99,227 +233,271 @@ class EndpointTester:
         """Print a colored section header."""
         print(f"\n{Color.BOLD}{Color.BLUE}>>> {text}{Color.RESET}")
 
-    def print_test(self, test_name: str, result: TestResult, message: str = ""):
-        """Print a test result."""
-        status_color = Color.GREEN if result == TestResult.PASS else Color.RED if result == TestResult.FAIL else Color.YELLOW
-        status_icon = "✅" if result == TestResult.PASS else "❌" if result == TestResult.FAIL else "⏭️"
-
-        print(f"{status_icon} {test_name:<50} {status_color}{result.value:>8}{Color.RESET}", end="")
-        if message:
-            print(f" - {message}", end="")
-        print()
-
-        self.test_results.append((test_name, result))
-
-    def login(self, user: TestUser) -> Optional[str]:
-        """Login a user and return JWT token."""
-        endpoint = f"{self.base_url}/login"
-        payload = {
-            "username": user.username,
-            "password": user.password
-        }
+    def record_test(self, test_name: str, result: TestResult):
+        """Count a test result for the summary."""
+        self._counts[result] += 1
+        if result is TestResult.FAIL:
+            self._failed_names.append(test_name)
+
+    def format_test(self, test_name: str, result: TestResult, message: str = "") -> str:
+        """Return the output line for a test result."""
+        status_color = Color.GREEN if result is TestResult.PASS else Color.RED if result is TestResult.FAIL else Color.YELLOW
+        status_icon = "✅" if result is TestResult.PASS else "❌" if result is TestResult.FAIL else "⏭️"
+
+        suffix = f" - {message}" if message else ""
+        return f"{status_icon} {test_name:<50} {status_color}{result.value:>8}{Color.RESET}{suffix}\n"
+
+    def print_results(self, results: List[Tuple[str, TestResult, str]]):
+        """Record gathered test results and print them in scheduling order, in one write."""
+        for test_name, result, _ in results:
+            self.record_test(test_name, result)
+        sys.stdout.writelines([self.format_test(*r) for r in results])
+
+    def _store_token(self, username: str, token: str):
+        """Remember a user's token and precompute its Authorization header."""
+        self.tokens[username] = token
+        self._auth_headers[username] = {"Authorization": f"Bearer {token}"}
+
+    async def test_endpoint(self, endpoint: str, method: str = "GET",
+                            user: Optional[TestUser] = None,
+                            expected_status: int = 200,
+                            description: str = "",
+                            probe: bool = False) -> Tuple[str, TestResult, str]:
+        """Test an endpoint and return a (test_name, result, message) tuple.
+
+        Results are returned rather than printed so that concurrently
+        gathered tests can be reported in a stable order. With ``probe`` set,
+        connection errors propagate so the caller can detect a missing server.
+        Tests for a user whose login failed are skipped without a request.
+        """
+        if user is not None and not self.tokens.get(user.username):
+            return f"{endpoint} ({user.username})", TestResult.SKIP, "no token"
 
-        try:
-            response = self.session.post(endpoint, json=payload, timeout=5)
-
-            if response.status_code == 200:
-                data = response.json()
-                token = data.get("token")
-                if token:
-                    self.tokens[user.username] = token
-                    return token
-
-            return None
-        except Exception as e:
-            print(f"Login error: {e}")
-            return None
-
-    def test_endpoint(self, endpoint: str, method: str = "GET",
-                     user: Optional[TestUser] = None,
-                     expected_status: int = 200,
-                     description: str = "") -> bool:
-        """Test an endpoint and return True if it matches expected status."""
-        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        user_str = f" ({user.username})" if user else ""
 
         try:
-            headers = {}
-            if user and user.username in self.tokens:
-                token = self.tokens[user.username]
-                headers["Authorization"] = f"Bearer {token}"
-
-            if method == "GET":
-                response = self.session.get(url, headers=headers, timeout=5)
-            elif method == "POST":
-                response = self.session.post(url, headers=headers, timeout=5)
-            else:
-                return False
+            headers = self._auth_headers.get(user.username) if user else None
+            async with self.client.stream(method, endpoint, headers=headers) as response:
+                # Only the status code is checked. Drain the raw body without
+                # buffering or decoding it so the connection returns to the pool.
+                async for _ in response.aiter_raw():
+                    pass
 
             success = response.status_code == expected_status
 
             # Format test name
-            user_str = f" ({user.username})" if user else ""
-            auth_str = " [NO AUTH]" if not user or user.username not in self.tokens else ""
+            auth_str = " [NO AUTH]" if not user else ""
             test_name = f"{endpoint}{user_str}{auth_str}"
 
             result = TestResult.PASS if success else TestResult.FAIL
             message = f"Expected {expected_status}, got {response.status_code}"
 
-            self.print_test(test_name, result, message)
-
-            return success
-        except Exception as e:
-            user_str = f" ({user.username})" if user else ""
-            self.print_test(f"{endpoint}{user_str}", TestResult.FAIL, f"Error: {str(e)}")
-            return False
+            return test_name, result, message
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if probe:
+                raise
+            return f"{endpoint}{user_str}", TestResult.FAIL, f"Error: {error_message(e)}"
+        except httpx.HTTPError as e:
+            return f"{endpoint}{user_str}", TestResult.FAIL, f"Error: {error_message(e)}"
 
-    def run_public_endpoint_tests(self):
+    async def run_public_endpoint_tests(self):
         """Test public endpoints that don't require authentication."""
         self.print_section("PUBLIC ENDPOINTS (No authentication required)")
 
-        # Health check
-        self.test_endpoint("/", "GET", None, 200, "Health check")
-
-        # Hello endpoint
-        self.test_endpoint("/hello/World", "GET", None, 200, "Greeting endpoint")
-
-        # Invalid routes should return 404
-        self.test_endpoint("/nonexistent", "GET", None, 404, "Non-existent endpoint")
-
-    def run_login_tests(self):
-        """Test login endpoint with all users."""
-        self.print_section("LOGIN ENDPOINT Tests")
+        # Health check. This is the first request of the run, so it also
+        # serves as the server availability probe and opens the first pooled
+        # connection before the concurrent tests start.
+        try:
+            health = await self.test_endpoint("/", "GET", None, 200, "Health check", probe=True)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            print(f"{Color.BOLD}{Color.RED}Error: Cannot connect to server at {self.base_url}{Color.RESET}")
+            print(f"Make sure the poem_auth example is running:\n")
+            print(f"  cd examples/poem_example")
+            print(f"  cargo run\n")
+            raise ServerUnavailableError(self.base_url)
+        self.print_results([health])
 
-        print("\nLogging in test users...\n")
+        self.print_results(await asyncio.gather(
+            # Hello endpoint
+            self.test_endpoint("/hello/World", "GET", None, 200, "Greeting endpoint"),
+            # Invalid routes should return 404
+            self.test_endpoint("/nonexistent", "GET", None, 404, "Non-existent endpoint"),
+        ))
 
-        for username, user in self.users.items():
-            endpoint = "/login"
-            url = f"{self.base_url}{endpoint}"
-            payload = {
-                "username": user.username,
-                "password": user.password
-            }
-
-            try:
-                response = self.session.post(url, json=payload, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    self.tokens[username] = data.get("token")
-                    self.print_test(
-                        f"Login {username}: {user.description}",
-                        TestResult.PASS,
-                        f"Token received (groups: {', '.join(user.groups)})"
-                    )
-                else:
-                    self.print_test(f"Login {username}", TestResult.FAIL, f"Status {response.status_code}")
-            except Exception as e:
-                self.print_test(f"Login {username}", TestResult.FAIL, str(e))
+    async def _do_login(self, user: TestUser) -> Tuple[str, TestResult, str]:
+        """Log in one test user, store the token, and return the test result."""
+        endpoint = "/login"
 
-        # Test invalid credentials
-        print()
-        invalid_payload = {"username": "alice", "password": "wrongpassword"}
         try:
-            response = self.session.post(f"{self.base_url}/login", json=invalid_payload, timeout=5)
+            response = await self.client.post(
+                endpoint, content=user.login_body, headers=JSON_HEADERS, timeout=LOGIN_TIMEOUT
+            )
+            if response.status_code != 200:
+                return f"Login {user.username}", TestResult.FAIL, f"Status {response.status_code}"
+
+            data = json_loads(response.content)
+            if not isinstance(data, dict):
+                return f"Login {user.username}", TestResult.FAIL, "invalid JSON response"
+
+            token = data.get("token")
+            if not token:
+                return f"Login {user.username}", TestResult.FAIL, "No token in response"
+
+            self._store_token(user.username, token)
+            return (
+                f"Login {user.username}: {user.description}",
+                TestResult.PASS,
+                f"Token received (groups: {', '.join(sorted(user.groups))})"
+            )
+        except httpx.HTTPError as e:
+            return f"Login {user.username}", TestResult.FAIL, error_message(e)
+        except ValueError:
+            return f"Login {user.username}", TestResult.FAIL, "invalid JSON response"
+
+    async def _do_invalid_login(self) -> Tuple[str, TestResult, str]:
+        """Attempt a login with a wrong password and expect 401."""
+        try:
+            response = await self.client.post(
+                "/login", content=INVALID_LOGIN_BODY, headers=JSON_HEADERS, timeout=LOGIN_TIMEOUT
+            )
             result = TestResult.PASS if response.status_code == 401 else TestResult.FAIL
-            self.print_test("Login with invalid password", result, f"Status {response.status_code}")
-        except Exception as e:
-            self.print_test("Login with invalid password", TestResult.FAIL, str(e))
+            return "Login with invalid password", result, f"Status {response.status_code}"
+        except httpx.HTTPError as e:
+            return "Login with invalid password", TestResult.FAIL, error_message(e)
 
-    def run_phase2_protected_endpoint_tests(self):
-        """Test Phase 2 endpoints (auto-extraction + manual guards)."""
-        self.print_section("PHASE 2: PROTECTED ENDPOINTS (Auto-extraction + Manual Guards)")
+    async def _login_then_test(self, user: TestUser):
+        """Log in one user, then immediately probe every protected endpoint as them.
 
-        # /protected - requires any authenticated user
-        print(f"\n{Color.BOLD}Endpoint: /protected{Color.RESET} (requires any authenticated user)")
-        print("Phase 2 feature: Automatic UserClaims extraction via FromRequest\n")
+        Returns the login result and a mapping of endpoint to probe result.
+        """
+        login = await self._do_login(user)
 
-        for user in self.users.values():
-            self.test_endpoint("/protected", "GET", user, 200)
+        probes = await asyncio.gather(*(
+            self.test_endpoint(test.endpoint, "GET", user, test.expected(user)) for test in TESTS
+        ))
+        return login, {test.endpoint: probe for test, probe in zip(TESTS, probes)}
 
-        # Test without token
-        self.test_endpoint("/protected", "GET", None, 401, "No authentication")
+    async def run_login_tests(self):
+        """Test login endpoint with all users.
 
-        # /admin - requires 'admins' group (manual guard check)
-        print(f"\n{Color.BOLD}Endpoint: /admin{Color.RESET} (requires 'admins' group)")
-        print("Phase 2 feature: Manual guard check inside handler\n")
+        Each user's protected endpoint probes start as soon as their own login
+        completes. The results are stored and reported by the phase sections.
+        """
+        self.print_section("LOGIN ENDPOINT Tests")
 
-        for user in self.users.values():
-            expected = 200 if "admins" in user.groups else 403
-            self.test_endpoint("/admin", "GET", user, expected)
+        print("\nLogging in test users...\n")
 
-        # /moderator - requires 'admins' OR 'moderators' group
-        print(f"\n{Color.BOLD}Endpoint: /moderator{Color.RESET} (requires 'admins' OR 'moderators' group)")
-        print("Phase 2 feature: Composable guards (HasAnyGroup)\n")
+        # Logins are independent, so all users (and the invalid-credentials
+        # check) are sent at once rather than one round-trip after another.
+        *per_user, invalid = await asyncio.gather(
+            *(self._login_then_test(user) for user in self.users),
+            self._do_invalid_login(),
+        )
+        self.print_results([login for login, _ in per_user])
 
-        for user in self.users.values():
-            expected = 200 if ("admins" in user.groups or "moderators" in user.groups) else 403
-            self.test_endpoint("/moderator", "GET", user, expected)
+        for _, probes in per_user:
+            for endpoint, probe in probes.items():
+                self._user_results.setdefault(endpoint, []).append(probe)
 
-    def run_phase2b_macro_endpoint_tests(self):
-        """Test Phase 2B endpoints (procedural macro-based guards)."""
-        self.print_section("PHASE 2B: MACRO-BASED ENDPOINTS (Declarative Authorization)")
+        # Test invalid credentials
+        print()
+        self.print_results([invalid])
 
-        # /admin/macro - #[require_group("admins")]
-        print(f"\n{Color.BOLD}Endpoint: /admin/macro{Color.RESET} (macro: #[require_group(\"admins\")])")
-        print("Phase 2B feature: Declarative single-group authorization\n")
+    async def _user_endpoint_results(self, test: EndpointTest) -> List[Tuple[str, TestResult, str]]:
+        """Per-user results for a TESTS row.
 
-        for user in self.users.values():
-            expected = 200 if "admins" in user.groups else 403
-            self.test_endpoint("/admin/macro", "GET", user, expected)
+        Uses the probes started by run_login_tests when available, otherwise
+        probes every user now (users without a token are skipped).
+        """
+        if test.endpoint in self._user_results:
+            return self._user_results[test.endpoint]
+        return await asyncio.gather(*(
+            self.test_endpoint(test.endpoint, "GET", user, test.expected(user)) for user in self.users
+        ))
+
+    async def _run_endpoint_section(self, phase: str):
+        """Report every TESTS row belonging to a phase."""
+        for test in TESTS:
+            if test.phase != phase:
+                continue
+
+            print(f"\n{Color.BOLD}Endpoint: {test.endpoint}{Color.RESET} ({test.requirement})")
+            print(f"Phase {phase} feature: {test.feature}\n")
+
+            self.print_results(await self._user_endpoint_results(test))
+
+            if test.no_auth_status is not None:
+                # Test without token
+                self.print_results([await self.test_endpoint(
+                    test.endpoint, "GET", None, test.no_auth_status, "No authentication"
+                )])
+
+    async def run_phase2_protected_endpoint_tests(self):
+        """Test Phase 2 endpoints (auto-extraction + manual guards).
+
+        Per-user results come from the probes started by run_login_tests, or
+        are probed here if that suite has not run.
+        """
+        self.print_section("PHASE 2: PROTECTED ENDPOINTS (Auto-extraction + Manual Guards)")
+        await self._run_endpoint_section("2")
+
+    async def run_phase2b_macro_endpoint_tests(self):
+        """Test Phase 2B endpoints (procedural macro-based guards).
+
+        Per-user results come from the probes started by run_login_tests, or
+        are probed here if that suite has not run.
+        """
+        self.print_section("PHASE 2B: MACRO-BASED ENDPOINTS (Declarative Authorization)")
+        await self._run_endpoint_section("2B")
 
-        # /moderator/macro - #[require_any_groups("admins", "moderators")]
-        print(f"\n{Color.BOLD}Endpoint: /moderator/macro{Color.RESET} (macro: #[require_any_groups(\"admins\", \"moderators\")])")
-        print("Phase 2B feature: Declarative OR-logic authorization\n")
+    async def _run_suites(self):
+        """Run the test suites in order."""
+        # Test public endpoints first
+        await self.run_public_endpoint_tests()
 
-        for user in self.users.values():
-            expected = 200 if ("admins" in user.groups or "moderators" in user.groups) else 403
-            self.test_endpoint("/moderator/macro", "GET", user, expected)
+        # Login all users
+        await self.run_login_tests()
 
-        # /dev/macro - #[require_all_groups("developers", "verified")]
-        print(f"\n{Color.BOLD}Endpoint: /dev/macro{Color.RESET} (macro: #[require_all_groups(\"developers\", \"verified\")])")
-        print("Phase 2B feature: Declarative AND-logic authorization\n")
+        # Test Phase 2 endpoints
+        await self.run_phase2_protected_endpoint_tests()
 
-        for user in self.users.values():
-            expected = 200 if ("developers" in user.groups and "verified" in user.groups) else 403
-            self.test_endpoint("/dev/macro", "GET", user, expected)
+        # Test Phase 2B endpoints
+        await self.run_phase2b_macro_endpoint_tests()
 
-    def run_all_tests(self):
-        """Run all test suites."""
+    async def run_all_tests(self) -> bool:
+        """Run all test suites and return True if every test passed."""
         self.print_header("POEM_AUTH EXAMPLE - COMPREHENSIVE ENDPOINT TEST SUITE")
 
         print(f"{Color.BOLD}Testing endpoint: {self.base_url}{Color.RESET}")
         print(f"\nTest Users:")
-        for user in self.users.values():
-            print(f"  • {user.username:10} - {user.description:40} Groups: {', '.join(user.groups)}")
+        for user in self.users:
+            print(f"  • {user.username:10} - {user.description:40} Groups: {', '.join(sorted(user.groups))}")
 
         try:
-            # Test public endpoints first
-            self.run_public_endpoint_tests()
-
-            # Login all users
-            self.run_login_tests()
-
-            # Test Phase 2 endpoints
-            self.run_phase2_protected_endpoint_tests()
-
-            # Test Phase 2B endpoints
-            self.run_phase2b_macro_endpoint_tests()
+            await asyncio.wait_for(self._run_suites(), SUITE_TIMEOUT)
 
             # Print summary
+            return self.print_summary()
+
+        except asyncio.TimeoutError:
+            print(f"\n\n{Color.RED}Test suite exceeded its {SUITE_TIMEOUT:.0f}s time budget{Color.RESET}")
             self.print_summary()
+            return False
 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print(f"\n\n{Color.YELLOW}Tests interrupted by user{Color.RESET}")
             self.print_summary()
-            sys.exit(1)
+            raise
 
     def print_summary(self):
         """Print test summary."""
         self.print_header("TEST SUMMARY")
 
-        total = len(self.test_results)
-        passed = sum(1 for _, result in self.test_results if result == TestResult.PASS)
-        failed = sum(1 for _, result in self.test_results if result == TestResult.FAIL)
-        skipped = sum(1 for _, result in self.test_results if result == TestResult.SKIP)
+        passed = self._counts[TestResult.PASS]
+        failed = self._counts[TestResult.FAIL]
+        skipped = self._counts[TestResult.SKIP]
+        total = passed + failed + skipped
 
         print(f"Total Tests:  {Color.BOLD}{total}{Color.RESET}")
         print(f"Passed:       {Color.BOLD}{Color.GREEN}{passed}{Color.RESET}")
@@ -328,32 +506,32 @@ class EndpointTester:
 
         if failed > 0:
             print(f"\n{Color.BOLD}{Color.RED}Failed Tests:{Color.RESET}")
-            for name, result in self.test_results:
-                if result == TestResult.FAIL:
-                    print(f"  ❌ {name}")
+            for name in self._failed_names:
+                print(f"  ❌ {name}")
             return False
         else:
             print(f"\n{Color.BOLD}{Color.GREEN}All tests passed! ✅{Color.RESET}")
             return True
 
-    def check_server_availability(self) -> bool:
-        """Check if the server is running."""
-        try:
-            response = self.session.get(f"{self.base_url}/", timeout=2)
-            return True
-        except requests.exceptions.ConnectionError:
-            print(f"{Color.BOLD}{Color.RED}Error: Cannot connect to server at {self.base_url}{Color.RESET}")
-            print(f"Make sure the poem_auth example is running:\n")
-            print(f"  cd examples/poem_example")
-            print(f"  cargo run\n")
-            return False
-        except Exception as e:
-            print(f"{Color.BOLD}{Color.RED}Error: {str(e)}{Color.RESET}")
-            return False
 
+async def run_tests(tester: EndpointTester) -> bool:
+    """Run all suites over one shared client, closing it afterwards."""
+    async with tester.client:
+        return await tester.run_all_tests()
 
-def main():
-    """Main entry point."""
+
+async def run(host: str = "localhost", port: int = 3000, http2: bool = False) -> bool:
+    """Library entry point: run the full suite against a server.
+
+    Lets other harnesses ``await run(...)`` in their own event loop instead
+    of spawning this script as a subprocess.
+    """
+    return await run_tests(EndpointTester(host=host, port=port, http2=http2))
+
+
+@functools.cache
+def _parser() -> argparse.ArgumentParser:
+    """Build the command-line parser once."""
     parser = argparse.ArgumentParser(
         description="Test poem_auth example endpoints",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -362,22 +540,30 @@ Examples:
   python3 test_endpoints.py
   python3 test_endpoints.py --host localhost --port 3000
   python3 test_endpoints.py --host 127.0.0.1 --port 8080
+  python3 test_endpoints.py --http2
         """
     )
 
     parser.add_argument("--host", default="localhost", help="Server host (default: localhost)")
     parser.add_argument("--port", type=int, default=3000, help="Server port (default: 3000)")
+    parser.add_argument("--http2", action="store_true",
+                        help="Use HTTP/2 prior knowledge over one multiplexed connection (requires httpx[http2])")
+
+    return parser
 
-    args = parser.parse_args()
 
-    tester = EndpointTester(host=args.host, port=args.port)
+def main():
+    """Main entry point."""
+    args = _parser().parse_args()
+    if args.http2 and not http2_available():
+        _parser().error("--http2 requires httpx[http2]")
 
-    # Check if server is available
-    if not tester.check_server_availability():
+    try:
+        passed = asyncio.run(run(host=args.host, port=args.port, http2=args.http2))
+    except (ServerUnavailableError, KeyboardInterrupt):
         sys.exit(1)
 
-    # Run all tests
-    tester.run_all_tests()
+    sys.exit(0 if passed else 1)
 
 
 if __name__ == "__main__":